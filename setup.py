@@ -16,7 +16,8 @@ DEPENDENCIES = [
     'pybleno',
     'pyserial',
     'gpiozero',
-    'pymemcache',
+    'pigpio',
+    'pymemcache>=4.0',
     'RPi.GPIO',
     'grpcio',
 ]
@@ -52,6 +52,20 @@ CHARACTERISTICS = dict(
     ),
 )
 
+# Peripheral.add_characteristic() keyword arguments for each characteristic, with IDs assigned in declaration order.
+# Only the fields bluezero accepts are passed, the description is just for logging.
+CHARACTERISTIC_KWARGS = {
+    key: dict(
+        srv_id=1,
+        chr_id=i,
+        uuid=char['uuid'],
+        value=[],
+        notifying='notify' in char['flags'],
+        flags=char['flags'],
+    )
+    for i, (key, char) in enumerate(CHARACTERISTICS.items(), start=1)
+}
+
 
 def graceful_exit(opentrickler):
     """Graceful exit function, stop advertising and disconnect clients."""
@@ -74,12 +88,9 @@ def main(config, memcache, args):
 
     atexit.register(graceful_exit, opentrickler)
     opentrickler.add_service(srv_id=1, uuid=TRICKLER_UUID, primary=True)
-    for i, key, char in enumerate(CHARACTERISTICS.items(), start=1):
-        logging.debug('Adding characteristic: %r', key)
-        char['srv_id'] = 1
-        char['chr_id'] = i
-        char['notifying'] = 'notify' in char['flags']
-        opentrickler.add_characteristic(**char)
+    for key, char_kwargs in CHARACTERISTIC_KWARGS.items():
+        logging.debug('Adding characteristic %s: %r', key, CHARACTERISTICS[key]['description'])
+        opentrickler.add_characteristic(**char_kwargs)
 
     opentrickler.publish()
 
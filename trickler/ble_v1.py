@@ -22,6 +22,17 @@ import helpers
 TRICKLER_UUID = '10000000-be5f-4b43-a49f-76f2d65c6e28'
 
 
+# Names of memcache variables which must be set before operating.
+REQUIRED_VARIABLES = (
+    'AUTO_MODE',
+    'SCALE_STATUS',
+    'SCALE_WEIGHT',
+    'SCALE_UNIT',
+    'TARGET_WEIGHT',
+    'TARGET_UNIT',
+)
+
+
 class BasicCharacteristic(pybleno.Characteristic): # pylint: disable=too-many-instance-attributes;
     """Base class for bluetooth characteristics."""
 
@@ -35,6 +46,8 @@ class BasicCharacteristic(pybleno.Characteristic): # pylint: disable=too-many-in
         self._send_fn = helpers.noop
         self._recv_fn = helpers.noop
         self.__value = None
+        # Serialized bytes of the current value, computed once per change and handed out on every read.
+        self._wire = None
 
     def onSubscribe(self, maxValueSize, updateValueCallback):
         """Register the callback functions when a bluetooth client subscribes to a characteristic for updates."""
@@ -51,8 +64,7 @@ class BasicCharacteristic(pybleno.Characteristic): # pylint: disable=too-many-in
         if offset:
             callback(pybleno.Characteristic.RESULT_ATTR_NOT_LONG, None)
         else:
-            data = self._send_fn(self.mc_value) # pylint: disable=assignment-from-none;
-            callback(pybleno.Characteristic.RESULT_SUCCESS, data)
+            callback(pybleno.Characteristic.RESULT_SUCCESS, self._wire)
 
     @property
     def mc_value(self):
@@ -65,20 +77,17 @@ class BasicCharacteristic(pybleno.Characteristic): # pylint: disable=too-many-in
         if value == self.__value:
             return
         logging.info('Updating %s: from %r to %r', self._mc_key, self.__value, value)
+        wire = None if value is None else self._send_fn(value)
+        # Only notify subscribers when the bytes sent over the air actually change.
+        notify = wire is not None and wire != self._wire
         self.__value = value
-        if self._updateValueCallback:
-            self._updateValueCallback(self._send_fn(self.__value))
+        self._wire = wire
+        if notify and self._updateValueCallback:
+            self._updateValueCallback(wire)
 
     def mc_get(self):
-        """Retry mechanism for memcache. May no longer be needed."""
-        for _ in range(2):
-            try:
-                value = self._memcache.get(self._mc_key)
-            except (KeyError, ValueError):
-                logging.exception('Cache miss.')
-            else:
-                break
-        return value
+        """Returns the current value from memcache, or None on a cache miss."""
+        return self._memcache.get(self._mc_key)
 
     def mc_update(self):
         """Updates the internal value to match what's in memcache."""
@@ -102,11 +111,11 @@ class AutoMode(BasicCharacteristic):
             'value': False,
         })
         self._memcache = memcache
-        self._mc_key = constants.AUTO_MODE.value
+        self._mc_key = constants.AUTO_MODE
         self._updateValueCallback = None
         self._send_fn = helpers.bool_to_bytes
         self._recv_fn = helpers.bytes_to_bool
-        self.__value = self.mc_get() # pylint: disable=unused-private-member
+        self.mc_value = self.mc_get()
 
     def onWriteRequest(self, data, offset, withoutResponse, callback):
         """Handle Bluetooth client change request for this characteristic."""
@@ -138,11 +147,11 @@ class ScaleStatus(BasicCharacteristic):
                 ))],
         })
         self._memcache = memcache
-        self._mc_key = constants.SCALE_STATUS.value
+        self._mc_key = constants.SCALE_STATUS
         self._updateValueCallback = None
         self._send_fn = helpers.enum_to_bytes
         self._recv_fn = helpers.bytes_to_enum
-        self.__value = self.mc_get() # pylint: disable=unused-private-member
+        self.mc_value = self.mc_get()
 
 
 class TargetWeight(BasicCharacteristic):
@@ -160,11 +169,11 @@ class TargetWeight(BasicCharacteristic):
                 ))],
         })
         self._memcache = memcache
-        self._mc_key = constants.TARGET_WEIGHT.value
+        self._mc_key = constants.TARGET_WEIGHT
         self._updateValueCallback = None
         self._send_fn = helpers.decimal_to_bytes
         self._recv_fn = helpers.bytes_to_decimal
-        self.__value = self.mc_get() # pylint: disable=unused-private-member
+        self.mc_value = self.mc_get()
 
     def onWriteRequest(self, data, offset, withoutResponse, callback):
         """Handle Bluetooth client request to change this characteristic value."""
@@ -196,20 +205,25 @@ class ScaleUnit(BasicCharacteristic): # pylint: disable=too-many-instance-attrib
                 ))],
         })
         self._memcache = memcache
-        self._mc_key = constants.SCALE_UNIT.value
-        self._write_mc_key = constants.TARGET_UNIT.value
+        self._mc_key = constants.SCALE_UNIT
+        self._write_mc_key = constants.TARGET_UNIT
         self._updateValueCallback = None
         self._send_fn = helpers.enum_to_bytes
         scale_units = None
+        delay = 0.05
         logging.info('Waiting for scale_units to populate in memcache...')
         while scale_units is None:
-            scale_units = self._memcache.get(constants.SCALE_UNITS.value)
+            scale_units = self._memcache.get(constants.SCALE_UNITS)
             logging.info('scale_units: %r', scale_units)
+            if scale_units is None:
+                # Back off gradually instead of spinning on memcache until the scale publishes its units.
+                time.sleep(delay)
+                delay = min(delay * 1.5, 0.5)
 
         # Pull unit mappings from memcache into a local Enum. Scale won't change, so neither will this.
         self._units_enum = enum.Enum('scale_units', scale_units)
         self._recv_fn = functools.partial(helpers.bytes_to_enum, self._units_enum)
-        self.__value = self.mc_get() # pylint: disable=unused-private-member,unused-private-member
+        self.mc_value = self.mc_get()
 
     def onWriteRequest(self, data, offset, withoutResponse, callback):
         if offset:
@@ -242,11 +256,11 @@ class ScaleWeight(BasicCharacteristic):
                 ))],
         })
         self._memcache = memcache
-        self._mc_key = constants.SCALE_WEIGHT.value
+        self._mc_key = constants.SCALE_WEIGHT
         self._updateValueCallback = None
         self._send_fn = helpers.decimal_to_bytes
         self._recv_fn = helpers.bytes_to_decimal
-        self.__value = self.mc_get() # pylint: disable=unused-private-member
+        self.mc_value = self.mc_get()
 
 
 class TricklerService(pybleno.BlenoPrimaryService):
@@ -264,11 +278,16 @@ class TricklerService(pybleno.BlenoPrimaryService):
                 TargetWeight(memcache, constants),
             ],
         })
+        self._memcache = memcache
+        # Index characteristics by memcache key so they can all be refreshed with a single multi-get.
+        self._characteristics_by_key = {c._mc_key: c for c in self['characteristics']} # pylint: disable=protected-access;
+        self._mc_keys = list(self._characteristics_by_key)
 
     def all_mc_update(self):
-        """Update all values in memcache."""
-        for characteristic in self['characteristics']:
-            characteristic.mc_update()
+        """Update all values from memcache in a single round-trip."""
+        values = self._memcache.get_multi(self._mc_keys)
+        for key, characteristic in self._characteristics_by_key.items():
+            characteristic.mc_value = values.get(key)
 
 
 def error_handler(error):
@@ -316,23 +335,17 @@ def graceful_exit(bleno):
     logging.info('Stopping OpenTrickler Bluetooth...')
 
 
-def all_variables_set(memcache, constants):
+def all_variables_set(memcache, keys):
     """Validation function to assert that the expected trickler variables are set (not None) before operating."""
-    variables = (
-        memcache.get(constants.AUTO_MODE.value, None) is not None,
-        memcache.get(constants.SCALE_STATUS.value, None) is not None,
-        memcache.get(constants.SCALE_WEIGHT.value, None) is not None,
-        memcache.get(constants.SCALE_UNIT.value, None) is not None,
-        memcache.get(constants.TARGET_WEIGHT.value, None) is not None,
-        memcache.get(constants.TARGET_UNIT.value, None) is not None,
-    )
-    logging.info('Variables: %r', variables)
-    return all(variables)
+    values = memcache.get_multi(keys)
+    logging.debug('Variables: %r', values)
+    return all(values.get(key) is not None for key in keys)
 
 
 def run(config, memcache, args):
     """Main Bluetooth control loop."""
-    constants = enum.Enum('memcache_vars', config['memcache_vars'])
+    constants = helpers.get_mc_keys(config)
+    required_keys = [getattr(constants, name) for name in REQUIRED_VARIABLES]
 
     logging.info('Setting up Bluetooth...')
     trickler_service = TricklerService(memcache, constants)
@@ -352,7 +365,7 @@ def run(config, memcache, args):
 
     logging.info('Checking if ready to advertise...')
     while 1:
-        if all_variables_set(memcache, constants):
+        if all_variables_set(memcache, required_keys):
             logging.info('Ready to advertise!')
             break
         time.sleep(0.1)
@@ -361,10 +374,21 @@ def run(config, memcache, args):
     bleno.start()
 
     logging.info('Starting OpenTrickler Bluetooth daemon...')
+    generation_key = constants.SCALE_GENERATION
+    last_generation = None
+    next_full_update = 0
     # Loop and keep TricklerService property values up to date from memcache.
+    # Only refresh everything when the scale generation changes, plus about once a second as a safety net for
+    # values written by other processes.
     while 1:
         try:
+            generation = memcache.get(generation_key)
+            if generation == last_generation and time.monotonic() < next_full_update:
+                time.sleep(0.25)
+                continue
             trickler_service.all_mc_update()
+            last_generation = generation
+            next_full_update = time.monotonic() + 1
         except (AttributeError, OSError):
             logging.exception('Caught possible bluetooth exception.')
         time.sleep(0.1)
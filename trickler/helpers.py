@@ -6,22 +6,89 @@ Released under the MIT license. See LICENSE file in the project root for details
 OpenTrickler
 https://github.com/ammolytics/projects/tree/develop/trickler
 """
-import array
+import ctypes
+import ctypes.util
 import decimal
+import functools
 import logging
-import struct
+import os
+import threading
+import types
 
 import pymemcache.client.base # pylint: disable=import-error;
 import pymemcache.serde # pylint: disable=import-error;
 
 
+# The only two payloads bool_to_bytes can return, indexed by the bool value.
+BOOL_BYTES = (b'\x00', b'\x01')
+
+# Memcache flags for types stored by TricklerSerde. Lower bits are already used by pymemcache.serde.
+FLAG_BOOL = 1 << 8
+FLAG_DECIMAL = 1 << 9
+FLAG_FLOAT = 1 << 10
+
+
+class TricklerSerde(pymemcache.serde.PickleSerde):
+    """Memcache serializer for the simple values shared between trickler processes.
+
+    bool, decimal.Decimal and float values are stored as plain text, tagged by flag, to avoid pickle on every get/set.
+    str and int values use the existing pymemcache encodings, anything else (enums, dicts) falls back to pickle.
+    """
+
+    def serialize(self, key, value):
+        """Returns a (bytes, flags) tuple for the value."""
+        value_type = type(value)
+        if value_type is bool:
+            return (b'1' if value else b'0'), FLAG_BOOL
+        if value_type is decimal.Decimal:
+            return str(value).encode('ascii'), FLAG_DECIMAL
+        if value_type is float:
+            return repr(value).encode('ascii'), FLAG_FLOAT
+        return super().serialize(key, value)
+
+    def deserialize(self, key, value, flags):
+        """Returns the original value from bytes and flags."""
+        if flags == FLAG_BOOL:
+            return value == b'1'
+        if flags == FLAG_DECIMAL:
+            return decimal.Decimal(value.decode('ascii'))
+        if flags == FLAG_FLOAT:
+            return float(value)
+        return super().deserialize(key, value, flags)
+
+
 def get_mc_client(server='127.0.0.1:11211'):
-    """Returns a memcache client instance."""
-    return pymemcache.client.base.Client(
+    """Returns a memcache client instance.
+
+    The client holds a single persistent connection for the life of the process and reconnects on the next call if
+    that connection drops. Create one per process and share it; don't create (or close) a client per request.
+    """
+    client = pymemcache.client.base.Client(
         server,
-        serde=pymemcache.serde.PickleSerde(),
+        serde=TricklerSerde(),
         connect_timeout=10,
-        timeout=2)
+        timeout=2,
+        no_delay=True,
+        socket_keepalive=pymemcache.client.base.KeepaliveOpts(),
+        # Writes don't wait for a reply. Reads on the same connection are still served after earlier writes.
+        default_noreply=True)
+    try:
+        # Connect eagerly so the first real request doesn't pay for the handshake.
+        client.version()
+    except OSError:
+        logging.warning('Memcache is not reachable yet, will connect on first use.')
+    return client
+
+
+# Memcache variables added after the original config file shipped, so existing configs may not list them.
+MC_KEY_DEFAULTS = {
+    'SCALE_GENERATION': 'scale_generation',
+}
+
+
+def get_mc_keys(config):
+    """Returns the configured memcache variable names as plain string attributes, e.g. keys.AUTO_MODE."""
+    return types.SimpleNamespace(**{**MC_KEY_DEFAULTS, **config['memcache_vars']})
 
 
 def setup_logging(level=logging.DEBUG):
@@ -32,11 +99,49 @@ def setup_logging(level=logging.DEBUG):
         datefmt='%Y-%m-%dT%H:%M:%S')
 
 
+# Stack size for threads started once memory is locked, since each thread's whole stack stays resident (the default is
+# usually 8MB). Far more than the scale reader and memcache threads need.
+REALTIME_THREAD_STACK_SIZE = 512 * 1024
+
+
+def set_realtime(priority, cpus=None):
+    """Runs the current process with SCHED_FIFO priority and locked memory, optionally pinned to cpus.
+
+    Threads started afterwards inherit the scheduling policy and get a smaller stack. Each step is skipped with a
+    warning if it is not permitted (usually when not running as root) or not supported by the platform.
+    """
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus)
+        except (AttributeError, OSError) as err:
+            logging.warning('Unable to pin to CPUs %r: %s', cpus, err)
+    if not priority:
+        return
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except (AttributeError, OSError) as err:
+        logging.warning('Unable to set real-time priority %r: %s', priority, err)
+        return
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        # MCL_CURRENT | MCL_FUTURE, so page faults can't stall the control loop.
+        if libc.mlockall(3) != 0:
+            logging.warning('Unable to lock memory: %s', os.strerror(ctypes.get_errno()))
+            return
+    except (AttributeError, OSError) as err:
+        logging.warning('Unable to lock memory: %s', err)
+        return
+    threading.stack_size(REALTIME_THREAD_STACK_SIZE)
+
+
 def is_even(dec):
     """Returns True if a decimal.Decimal is even, False if odd."""
-    exp = dec.as_tuple().exponent
-    factor = 10 ** (exp * -1)
-    return (dec * factor) % 2 == 0
+    _, digits, exponent = dec.as_tuple()
+    # A positive exponent means trailing zeros that aren't stored in the digits, e.g. Decimal('1E+1') is 10.
+    if exponent > 0 or not digits:
+        return True
+    # Otherwise it's the parity of the value scaled to an integer, which is its last digit.
+    return digits[-1] % 2 == 0
 
 
 def noop(*args, **kwargs):
@@ -46,9 +151,7 @@ def noop(*args, **kwargs):
 
 def bool_to_bytes(value):
     """Converts bool to bytes."""
-    data_bytes = array.array('B', [0] * 1)
-    struct.pack_into("<B", data_bytes, 0, value)
-    return data_bytes
+    return BOOL_BYTES[bool(value)]
 
 
 def bytes_to_bool(data_bytes):
@@ -59,9 +162,7 @@ def bytes_to_bool(data_bytes):
 
 def str_to_bytes(value):
     """Converts str to bytes."""
-    data_bytes = array.array('B', [])
-    data_bytes.frombytes(value.encode('utf-8'))
-    return data_bytes
+    return value.encode('utf-8')
 
 
 def bytes_to_str(data_bytes):
@@ -71,8 +172,7 @@ def bytes_to_str(data_bytes):
 
 def decimal_to_bytes(value):
     """Converts decimal to bytes."""
-    value = str(value)
-    return str_to_bytes(value)
+    return str(value).encode('utf-8')
 
 
 def bytes_to_decimal(data_bytes):
@@ -81,11 +181,10 @@ def bytes_to_decimal(data_bytes):
     return decimal.Decimal(value)
 
 
+@functools.lru_cache(maxsize=None)
 def enum_to_bytes(value_enum):
     """Converts enum to bytes."""
-    data_bytes = array.array('B', [0] * 1)
-    struct.pack_into("<B", data_bytes, 0, value_enum.value)
-    return data_bytes
+    return bytes((value_enum.value,))
 
 
 def bytes_to_enum(enum_cls, data_bytes):
@@ -67,14 +67,18 @@ LED_MODES = {
 }
 
 
-def all_variables_set(memcache, constants):
+# Names of memcache variables which must be set before operating.
+REQUIRED_VARIABLES = (
+    'AUTO_MODE',
+    'TRICKLER_MOTOR_SPEED',
+)
+
+
+def all_variables_set(memcache, keys):
     """Validation function to assert that the expected trickler variables are set (not None) before operating."""
-    variables = (
-        memcache.get(constants.AUTO_MODE.value, None) is not None,
-        memcache.get(constants.TRICKLER_MOTOR_SPEED.value, None) is not None,
-    )
-    logging.info('Variables: %r', variables)
-    return all(variables)
+    values = memcache.get_multi(keys)
+    logging.debug('Variables: %r', values)
+    return all(values.get(key) is not None for key in keys)
 
 
 def graceful_exit(status_led):
@@ -84,13 +88,13 @@ def graceful_exit(status_led):
     status_led.close()
 
 
-def run(config, memcache, args):
+def run(config, memcache, args): # pylint: disable=too-many-locals;
     """Main LED control loop."""
     # Turn this feature off if configured to do so.
     if config['leds'].getboolean('enable_status_leds') is False:
         return
 
-    constants = enum.Enum('memcache_vars', config['memcache_vars'])
+    constants = helpers.get_mc_keys(config)
 
     last_led_fn = None
     status_led_pin = int(config['leds']['status_led_pin'])
@@ -98,17 +102,23 @@ def run(config, memcache, args):
     status_led = gpiozero.PWMLED(status_led_pin, active_high=active_high)
     atexit.register(graceful_exit, status_led=status_led)
 
+    # Resolve the configured LED function for each status, and the memcache keys, once up front.
+    led_fn_by_status = {status: LED_MODES.get(config['leds'][STATUS_MAP[status]]) for status in TricklerStatus}
+    auto_mode_key = constants.AUTO_MODE
+    motor_speed_key = constants.TRICKLER_MOTOR_SPEED
+    required_keys = [getattr(constants, name) for name in REQUIRED_VARIABLES]
+
     logging.info('Checking if ready to begin...')
     while 1:
-        if all_variables_set(memcache, constants):
+        if all_variables_set(memcache, required_keys):
             logging.info('Ready!')
             break
         time.sleep(0.1)
 
     while 1:
         try:
-            motor_on = float(memcache.get(constants.TRICKLER_MOTOR_SPEED.value, 0.0)) > 0
-            auto_mode = memcache.get(constants.AUTO_MODE.value)
+            motor_on = float(memcache.get(motor_speed_key, 0.0)) > 0
+            auto_mode = memcache.get(auto_mode_key)
         except (KeyError, ValueError):
             logging.exception('Possible cache miss, trying again.')
             break
@@ -119,7 +129,7 @@ def run(config, memcache, args):
             logging.info('Bad state. auto_mode:%r and motor_on:%r', auto_mode, motor_on)
             break
 
-        led_fn = LED_MODES.get(config['leds'][STATUS_MAP[status]])
+        led_fn = led_fn_by_status[status]
         if led_fn != last_led_fn:
             led_fn(status_led)
             last_led_fn = led_fn
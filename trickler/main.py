@@ -7,9 +7,7 @@ OpenTrickler
 https://github.com/ammolytics/projects/tree/develop/trickler
 """
 
-import datetime
 import decimal
-import enum
 import logging
 import time
 
@@ -29,67 +27,190 @@ import scales
 # 7: Powder pan/cup?
 
 
-def trickler_loop(memcache, constants, pid, trickler_motor, scale, target_weight, target_unit, pidtune_logger): # pylint: disable=too-many-arguments;
+# Fixed rate of the trickler control loop, in Hz.
+TRICKLER_LOOP_HZ = 50
+# Tail of each loop period which is spun rather than slept, since sleep() can overshoot by about this much.
+TRICKLER_LOOP_SPIN = 0.0002
+# Age of the latest scale reading, in seconds, after which the trickler holds the motor instead of updating the PID.
+SCALE_STALE_TIMEOUT = 0.2
+# Age of the latest scale reading, in seconds, after which trickling stops since the motor would be running blind.
+SCALE_STALE_LIMIT = 1.0
+# Rate at which the motor speed is published to memcache while trickling, in Hz.
+TRICKLER_SPEED_PUBLISH_HZ = 10
+# Pause between passes of the main loop while auto mode is off, in seconds.
+MAIN_LOOP_IDLE = 0.25
+
+
+def pid_stepper(kp, ki, kd, setpoint, *, windup_guard, out_min, out_max): # pylint: disable=too-many-arguments;
+    """Returns a step function for a PID controller.
+
+    Each call takes the measured value and the seconds since the previous call, and returns the new output clamped
+    to out_min/out_max. As in PID.PID, the integrated error is bounded by windup_guard on its own, so the output clamp
+    doesn't have to double as the anti-windup. State is held in closure variables, which are cheaper to access than
+    instance attributes inside the control loop.
+    """
+    last_error = None
+    int_error = 0.0
+
+    def step(measured, delta_time):
+        nonlocal last_error, int_error
+        error = setpoint - measured
+        output = kp * error
+        # The first step has no previous error to integrate from or differentiate against.
+        if last_error is not None:
+            int_error += error * delta_time
+            if int_error < -windup_guard:
+                int_error = -windup_guard
+            elif int_error > windup_guard:
+                int_error = windup_guard
+            output += ki * int_error
+            if delta_time > 0:
+                output += kd * (error - last_error) / delta_time
+        last_error = error
+        return out_min if output < out_min else out_max if output > out_max else output
+
+    return step
+
+
+def trickler_loop(memcache, constants, pid, trickler_motor, scale_reader, target_weight, target_unit, pidtune_logger): # pylint: disable=too-many-arguments,too-many-locals,too-many-branches,too-many-statements;
     """Main trickler control loop run when all devices are ready, target weight is set, and auto-mode is on."""
-    pidtune_logger.info('timestamp, input (motor %), output (weight %)')
+    pidtune_logger.info('timestamp (ns), input (motor %), output (weight %)')
     logging.info('Starting trickling process...')
+    scale = scale_reader.scale
+    auto_mode_key = constants.AUTO_MODE
+    # Control math runs on floats (target_weight is passed in as one), decimal.Decimal arithmetic is much slower.
+    inv_target_weight = 1.0 / target_weight
+    # Check log levels once, so disabled logging costs nothing inside the loop.
+    pid_tune_enabled = pidtune_logger.isEnabledFor(logging.INFO)
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+    info_enabled = logging.getLogger().isEnabledFor(logging.INFO)
+    # The configured gains are tuned against percent of target weight. The controller is fed raw weight instead, so
+    # scale the gains once here rather than converting every reading to a percentage.
+    gain_scale = 100.0 * inv_target_weight
+    # Fresh controller state for each trickle, using the gains and setpoint configured on pid.
+    pid_step = pid_stepper(
+        pid.Kp * gain_scale,
+        pid.Ki * gain_scale,
+        pid.Kd * gain_scale,
+        pid.SetPoint,
+        # The guard bounds integrated percent error, so convert it to raw weight like the gains.
+        windup_guard=pid.windup_guard / gain_scale,
+        out_min=trickler_motor.min_pwm,
+        out_max=trickler_motor.max_pwm)
+    period = 1.0 / TRICKLER_LOOP_HZ
+    # Motor speed writes are coalesced and flushed to memcache every few iterations.
+    publish_every = max(1, TRICKLER_LOOP_HZ // TRICKLER_SPEED_PUBLISH_HZ)
+    iteration = 0
+    # PID tuning timestamps are integer nanoseconds since the trickle started, cheap to take and exact to parse.
+    pid_tune_start = time.monotonic_ns()
+    next_time = time.monotonic()
+    # Readings are only acted on once. The scale reports at ~10Hz, slower than this loop runs, and stepping the PID
+    # again on the same reading would re-apply the derivative kick each iteration and ratchet the output upward.
+    last_reading_at = None
 
     # Note(eric): All `break` calls will exit the loop and this function.
     while 1:
+        # Hold a fixed cadence. If the last iteration overran, drop the missed frames instead of trying to catch up.
+        next_time += period
+        now = time.monotonic()
+        if now >= next_time:
+            next_time = now
+        else:
+            if next_time - now > TRICKLER_LOOP_SPIN:
+                time.sleep(next_time - now - TRICKLER_LOOP_SPIN)
+            while time.monotonic() < next_time:
+                pass
+
+        iteration += 1
+        if iteration % publish_every == 0:
+            trickler_motor.flush()
+
+        # Taken before the scale values below, so a reading that lands mid-iteration is handled on the next one.
+        reading_at = scale.updated_at
+        stale_time = time.monotonic() - reading_at
+        if stale_time > SCALE_STALE_TIMEOUT:
+            # None of the checks below can stop the motor without new readings, so don't hold it for long.
+            if stale_time > SCALE_STALE_LIMIT or not scale_reader.is_alive():
+                logging.warning('No reading from the scale for %.2fs, stopping.', stale_time)
+                break
+            # The scale has stalled. Hold the motor rather than stepping the PID on an old reading, but still stop
+            # promptly if auto mode is turned off.
+            if debug_enabled:
+                logging.debug('Scale reading is stale, skipping PID update.')
+            if not memcache.get(auto_mode_key):
+                logging.debug('auto mode disabled.')
+                break
+            continue
+        # Everything below acts on a scale reading, so wait for a new one.
+        if reading_at == last_reading_at:
+            continue
+
         # Stop running if auto mode is disabled.
-        if not memcache.get(constants.AUTO_MODE.value):
+        if not memcache.get(auto_mode_key):
             logging.debug('auto mode disabled.')
             break
 
-        # Read scale values (weight/unit/stable)
-        scale.update()
+        # Latest scale values, kept up to date by the scale reader thread. Read each property once per reading.
+        scale_weight = scale.weight
+        scale_unit = scale.unit
+        weight = float(scale_weight)
 
         # Stop running if scale's unit no longer matches target unit.
-        if scale.unit != target_unit:
+        if scale_unit != target_unit:
             logging.debug('Target unit does not match scale unit.')
             break
 
         # Stop running if pan removed.
-        if scale.weight < 0:
+        if weight < 0.0:
             logging.debug('Pan removed.')
             break
 
-        remainder_weight = target_weight - scale.weight
-        logging.debug('remainder_weight: %r', remainder_weight)
+        remainder_weight = target_weight - weight
+        if debug_enabled:
+            logging.debug('remainder_weight: %r', remainder_weight)
 
-        pidtune_logger.info(
-            '%s, %s, %s',
-            datetime.datetime.now().timestamp(),
-            trickler_motor.speed,
-            scale.weight / target_weight)
+        if pid_tune_enabled:
+            pidtune_logger.info(
+                '%d, %s, %s',
+                time.monotonic_ns() - pid_tune_start,
+                trickler_motor.speed,
+                weight * inv_target_weight)
 
         # Trickling complete.
-        if remainder_weight <= 0:
+        if remainder_weight <= 0.0:
             logging.debug('Trickling complete, motor turned off and PID reset.')
             break
 
-        # PID controller requires float value instead of decimal.Decimal
-        pid.update(float(scale.weight / target_weight) * 100)
-        trickler_motor.update(pid.output)
-        logging.debug('trickler_motor.speed: %r, pid.output: %r', trickler_motor.speed, pid.output)
-        logging.info(
-            'remainder: %s %s scale: %s %s motor: %s',
-            remainder_weight,
-            target_unit,
-            scale.weight,
-            scale.unit,
-            trickler_motor.speed)
+        # dt is the time between readings, capped so a stall isn't integrated into the next step (anti-windup).
+        delta_time = 0.0 if last_reading_at is None else min(reading_at - last_reading_at, SCALE_STALE_TIMEOUT)
+        last_reading_at = reading_at
+        pid_output = pid_step(weight, delta_time)
+        trickler_motor.update(pid_output)
+        if debug_enabled:
+            logging.debug('trickler_motor.speed: %r, pid_output: %r', trickler_motor.speed, pid_output)
+        if info_enabled:
+            logging.info(
+                'remainder: %.4f %s scale: %s %s motor: %s',
+                remainder_weight,
+                target_unit,
+                scale_weight,
+                scale_unit,
+                trickler_motor.speed)
 
     # Clean up tasks.
     trickler_motor.off()
-    # Clear PID values.
-    pid.clear()
     logging.info('Trickling process stopped.')
 
 
-def main(config, memcache, args, pidtune_logger):
+def main(config, memcache, args, pidtune_logger): # pylint: disable=too-many-locals;
     """Main trickler function. This runs everything."""
-    constants = enum.Enum('memcache_vars', config['memcache_vars'])
+    # Keep the control loop from being preempted or paged out, before any threads are started.
+    cpu_affinity = config['general'].get('cpu_affinity')
+    helpers.set_realtime(
+        config['general'].getint('realtime_priority', fallback=0),
+        {int(cpu) for cpu in cpu_affinity.split(',')} if cpu_affinity else None)
+
+    constants = helpers.get_mc_keys(config)
 
     # Set up the PID controller.
     pid = PID.PID(
@@ -99,63 +220,81 @@ def main(config, memcache, args, pidtune_logger):
     logging.debug('pid: %r', pid)
 
     # Set up the trickler motor controller.
-    trickler_motor = motors.TricklerMotor(config, memcache=memcache)
+    trickler_motor = motors.TricklerMotor(config, memcache=memcache, constants=constants)
     logging.debug('trickler_motor: %r', trickler_motor)
     #servo_motor = gpiozero.AngularServo(int(config['motors']['servo_pin']))
 
     # Set up the scale controller.
     scale_cls = scales.SCALES[config['scale']['model']]
+    # The scale is read on its own thread, so give it its own memcache client (they aren't thread-safe).
+    scale_memcache = helpers.get_mc_client()
     # Wait until the scale is ready.
     while 1:
         try:
-            scale = scale_cls(config, memcache=memcache)
+            scale = scale_cls(config, memcache=scale_memcache)
         except scales.ScaleNotReady:
             logging.info('Scale not ready, trying again...')
             time.sleep(10)
         else:
             logging.debug('scale: %r', scale)
             break
+    # Read the scale in the background so neither control loop blocks on the serial port.
+    scale_reader = scales.ScaleReader(scale)
+    scale_reader.start()
+
+    auto_mode_key = constants.AUTO_MODE
+    target_weight_key = constants.TARGET_WEIGHT
+    target_unit_key = constants.TARGET_UNIT
+    settings_keys = [auto_mode_key, target_weight_key, target_unit_key]
 
     # Set initial values in memcache.
     memcache.set_multi({
-        constants.AUTO_MODE.value: args.auto_mode or False,
-        constants.TARGET_WEIGHT.value: args.target_weight or decimal.Decimal('0.0'),
-        constants.TARGET_UNIT.value: scale.unit_map.get(args.target_unit, 'GN'),
+        auto_mode_key: args.auto_mode or False,
+        target_weight_key: args.target_weight or decimal.Decimal('0.0'),
+        target_unit_key: scale.unit_map.get(args.target_unit, 'GN'),
     })
 
     # Outer-most control loop for the whole trickler system.
     while 1:
-        # Update settings from memcache.
-        auto_mode = memcache.get(constants.AUTO_MODE.value)
-        target_weight = memcache.get(constants.TARGET_WEIGHT.value)
-        target_unit = memcache.get(constants.TARGET_UNIT.value)
-        # Use percentages for PID control to avoid complexity w/ different units of weight.
-        pid.SetPoint = 100.0
-        scale.update()
+        # Update settings from memcache in a single round-trip.
+        settings = memcache.get_multi(settings_keys)
+        auto_mode = settings.get(auto_mode_key)
+        target_weight = settings.get(target_weight_key)
+        target_unit = settings.get(target_unit_key)
+        # Comparisons and control run on floats, the Decimal values are only kept for display.
+        target_weight_f = float(target_weight)
+        # PID runs in the target's unit of weight, trickler_loop scales the percentage-tuned gains to match.
+        pid.SetPoint = target_weight_f
+        # Nothing can start until auto mode is turned on, so don't poll memcache at the full scale rate meanwhile.
+        if not auto_mode:
+            time.sleep(MAIN_LOOP_IDLE)
+        # Wait for the next scale reading, which also paces this loop.
+        scale_reader.wait(1)
 
         # Set scale to match target unit.
         if target_unit != scale.unit:
             logging.info('scale.unit: %r, target_unit: %r', scale.unit, target_unit)
-            scale.change_unit()
+            scale_reader.change_unit()
 
+        scale_weight = scale.weight
         logging.info(
             'target: %s %s scale: %s %s auto_mode: %s',
             target_weight,
             target_unit,
-            scale.weight,
+            scale_weight,
             scale.unit,
             auto_mode)
 
-        # Powder pan in place, scale stable, ready to trickle.
-        if (scale.weight >= 0 and
-                scale.weight < target_weight and
+        # Powder pan in place, scale stable, ready to trickle. Cheapest checks first.
+        if (auto_mode and
                 scale.unit == target_unit and
-                scale.is_stable and
-                auto_mode):
+                0.0 <= float(scale_weight) < target_weight_f and
+                scale.is_stable):
             # Wait a second to start trickling.
             time.sleep(1)
             # Run trickler loop.
-            trickler_loop(memcache, constants, pid, trickler_motor, scale, target_weight, target_unit, pidtune_logger)
+            trickler_loop(
+                memcache, constants, pid, trickler_motor, scale_reader, target_weight_f, target_unit, pidtune_logger)
 
 
 if __name__ == '__main__':
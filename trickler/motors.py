@@ -8,13 +8,23 @@ https://github.com/ammolytics/projects/tree/develop/trickler
 """
 
 import atexit
-import enum
 import logging
 
 import gpiozero # pylint: disable=import-error;
+try:
+    import pigpio # pylint: disable=import-error;
+except ImportError:
+    # Optional, without it the motor uses gpiozero's PWM.
+    pigpio = None
 
+import helpers
 
-class TricklerMotor:
+
+# BCM pins wired to the Pi's hardware PWM peripheral.
+HARDWARE_PWM_PINS = (12, 13, 18, 19)
+
+
+class TricklerMotor: # pylint: disable=too-many-instance-attributes;
     """Controls a small vibration DC motor with the PWM controller on the Pi."""
 
     def __init__(self, config, **kwargs):
@@ -22,53 +32,93 @@ class TricklerMotor:
         # Store memcache client if provided.
         self._memcache = kwargs.get('memcache')
         # Pull default values from config, giving preference to provided arguments.
-        self._constants = enum.Enum('memcache_vars', dict(config['memcache_vars']))
+        self._constants = kwargs.get('constants') or helpers.get_mc_keys(config)
 
         self.motor_pin = kwargs.get('motor_pin', config['motors']['trickler_pin'])
-        self.min_pwm = float(kwargs.get('min_pwm', config['motors']['trickler_min_pwm']))
-        self.max_pwm = float(kwargs.get('max_pwm', config['motors']['trickler_max_pwm']))
-
-        self.pwm = gpiozero.PWMOutputDevice(self.motor_pin)
+        self.min_pwm = int(kwargs.get('min_pwm', config['motors']['trickler_min_pwm']))
+        self.max_pwm = int(kwargs.get('max_pwm', config['motors']['trickler_max_pwm']))
+        self.pwm_frequency = int(kwargs.get('pwm_frequency', config['motors'].get('trickler_pwm_frequency', 100)))
+        self._speed_key = self._constants.TRICKLER_MOTOR_SPEED
+        # Last speed written, so repeated writes of the same speed can be skipped.
+        self._last_speed = None
+        # Speed not yet published to memcache, written by flush().
+        self._unpublished_speed = None
+
+        # Prefer hardware PWM through the pigpio daemon, which is a single socket write per speed change. Fall back to
+        # gpiozero when pigpio isn't installed, the daemon isn't running or the pin isn't hardware PWM capable.
+        self._pin = int(self.motor_pin)
+        self._pi = None
+        self.pwm = None
+        if pigpio is not None and self._pin in HARDWARE_PWM_PINS:
+            pi = pigpio.pi(show_errors=False)
+            if pi.connected:
+                self._pi = pi
+            else:
+                # Release the unconnected handle, rather than leaving it to the garbage collector.
+                pi.stop()
+        if self._pi is None:
+            self.pwm = gpiozero.PWMOutputDevice(self.motor_pin, frequency=self.pwm_frequency)
         logging.debug(
             'Created pwm motor on PIN %r with min %r and max %r: %r',
             self.motor_pin,
             self.min_pwm,
             self.max_pwm,
-            self.pwm)
+            self._pi or self.pwm)
         atexit.register(self._graceful_exit)
 
     def _graceful_exit(self):
         """Graceful exit function, turn off motor and close GPIO pin."""
         logging.debug('Closing trickler motor...')
-        self.pwm.off()
-        self.pwm.close()
+        if self._pi is not None:
+            self._pi.hardware_PWM(self._pin, 0, 0)
+            self._pi.stop()
+        else:
+            self.pwm.off()
+            self.pwm.close()
 
     def update(self, target_pwm):
         """Change PWM speed of motor (int), enforcing clamps."""
         logging.debug('Updating target_pwm to %r', target_pwm)
-        target_pwm = max(min(int(target_pwm), self.max_pwm), self.min_pwm)
+        tmin = self.min_pwm
+        tmax = self.max_pwm
+        target_pwm = int(target_pwm)
+        target_pwm = tmin if target_pwm < tmin else tmax if target_pwm > tmax else target_pwm
         logging.debug('Adjusted clamped target_pwm to %r', target_pwm)
-        self.set_speed(target_pwm / 100)
+        self.set_speed(target_pwm * 0.01)
 
     def set_speed(self, speed):
         """Sets the PWM speed (float) and circumvents any clamps."""
         # Speed must be 0 - 1.
         if 0 <= speed <= 1:
-            logging.debug('Setting speed from %r to %r', self.speed, speed)
-            self.pwm.value = speed
-            if self._memcache:
-                self._memcache.set(self._constants.TRICKLER_MOTOR_SPEED.value, self.speed)
+            # Skip the GPIO and memcache writes if the speed hasn't changed.
+            if self._last_speed is not None and abs(speed - self._last_speed) < 1e-4:
+                return
+            logging.debug('Setting speed from %r to %r', self._last_speed, speed)
+            if self._pi is not None:
+                self._pi.hardware_PWM(self._pin, self.pwm_frequency, int(speed * 1000000))
+            else:
+                self.pwm.value = speed
+            self._last_speed = speed
+            self._unpublished_speed = speed
         else:
             logging.debug('invalid motor speed: %r must be between 0 and 1.', speed)
 
+    def flush(self):
+        """Publishes the latest speed to memcache, if it changed since the last flush."""
+        if self._unpublished_speed is not None:
+            if self._memcache:
+                self._memcache.set(self._speed_key, self._unpublished_speed)
+            self._unpublished_speed = None
+
     def off(self):
         """Turns motor off."""
         self.set_speed(0)
+        self.flush()
 
     @property
     def speed(self):
         """Returns motor speed (float)."""
-        return self.pwm.value
+        return self._last_speed or 0.0
 
 
 # Handle command-line execution.
@@ -77,8 +127,6 @@ if __name__ == '__main__':
     import configparser
     import time
 
-    import helpers
-
 
     # Default argument values.
     DEFAULTS = dict(
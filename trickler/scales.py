@@ -8,17 +8,25 @@ https://github.com/ammolytics/projects/tree/develop/trickler
 """
 
 import atexit
-import collections
 import decimal
 import enum
+import functools
 import logging
+import os
+import select
+import threading
 import time
 
+import pymemcache.exceptions # pylint: disable=import-error;
 import serial # pylint: disable=import-error;
 
 import helpers
 
 
+# Minimum seconds between logged memcache write failures, so an outage doesn't flood the log at the frame rate.
+MC_ERROR_LOG_INTERVAL = 10.0
+
+
 class ScaleException(Exception):
     """Base exception for scales."""
 
@@ -27,9 +35,35 @@ class ScaleNotReady(ScaleException):
     """Scale not ready."""
 
 
-def noop(*args, **kwargs):
-    """No-op function for scales to use on throwaway status updates."""
-    return
+@functools.lru_cache(maxsize=64)
+def _to_decimal(weight):
+    """Returns the weight bytes as a decimal.Decimal, cached since a settled scale repeats the same reading."""
+    return decimal.Decimal(weight.decode('latin-1'))
+
+
+def _make_stable_unstable(weight_cols, unit_cols, infer_stability=False):
+    """Returns a _stable_unstable method specialized to a scale's fixed frame columns (as slices).
+
+    The columns are closure variables, so the method does no per-frame lookups to find them. Set infer_stability for
+    scales that don't report stability themselves.
+    """
+    def _stable_unstable(self, line):
+        """Update the scale when status is stable or unstable."""
+        if infer_stability:
+            # Count the latest reading and update the internal stability bit.
+            self._push_reading(line) # pylint: disable=protected-access;
+        # Store the numeric weight from the scale reading. decimal.Decimal ignores surrounding whitespace but not
+        # spaces between the sign and digits, which some scales pad with.
+        self.weight = _to_decimal(line[weight_cols].replace(b' ', b''))
+        # Only weight readings count as fresh, status-only frames (overload, errors) leave the reading time alone.
+        self.updated_at = time.monotonic()
+        # Get the unit of measurement from the scale reading and store the mapped value and its resolution.
+        unit = line[unit_cols].strip()
+        self.unit, self.resolution = self._unit_resolution_map[unit] # pylint: disable=protected-access;
+        # Update memcache values.
+        self._update_memcache() # pylint: disable=protected-access;
+
+    return _stable_unstable
 
 
 class SerialScale: # pylint: disable=too-many-instance-attributes;
@@ -50,12 +84,34 @@ class SerialScale: # pylint: disable=too-many-instance-attributes;
         SERIAL_NUMBER = 5
         ACKNOWLEDGE = 6
 
+    # Mapping of self.unit keys to string units of weight as used by the scale. Define these in subclasses.
+    UNIT_MAP = {}
+    REVERSE_UNIT_MAP = {}
+    # Map self.Units to matching resolutions with decimal.Decimal values.
+    RESOLUTION_MAP = {}
+
     def __init__(self, config, **kwargs):
         """Base scale class constructor. Should not usually need to be overridden."""
         # Store memcache client if provided.
         self._memcache = kwargs.get('memcache')
         # Pull default values from config, giving preference to provided arguments.
-        self._constants = enum.Enum('memcache_vars', dict(config['memcache_vars']))
+        self._constants = helpers.get_mc_keys(config)
+        # Memcache keys written on every reading, looked up once.
+        self._generation_key = self._constants.SCALE_GENERATION
+        self._status_key = self._constants.SCALE_STATUS
+        self._weight_key = self._constants.SCALE_WEIGHT
+        self._unit_key = self._constants.SCALE_UNIT
+        self._resolution_key = self._constants.SCALE_RESOLUTION
+        self._is_stable_key = self._constants.SCALE_IS_STABLE
+        # Reused for every memcache write, only the values change.
+        self._mc_payload = dict.fromkeys((
+            self._generation_key,
+            self._status_key,
+            self._weight_key,
+            self._unit_key,
+            self._resolution_key,
+            self._is_stable_key,
+        ))
 
         # Set up crash protection that closes the serial port so the program can restart.
         atexit.register(self._graceful_exit)
@@ -69,26 +125,106 @@ class SerialScale: # pylint: disable=too-many-instance-attributes;
         except (serial.SerialException, FileNotFoundError) as exc:
             logging.exception('Scale is not ready! The error traceback follows for context.')
             raise ScaleNotReady() from exc
+        # pyserial configures the port (termios), reads go straight to the file descriptor.
+        self._fd = self._serial.fileno()
+        self._timeout = timeout
 
         # Set default values, which should be overwritten quickly.
         self.unit = self.Units.GRAINS
-        self.resolution = self.resolution_map[self.unit]
+        self.resolution = self.RESOLUTION_MAP[self.unit]
         self.weight = decimal.Decimal('0.00')
         self.status = self.StatusMap.STABLE
+        # Monotonic time of the latest weight reading, so consumers can tell when the values have gone stale.
+        self.updated_at = 0.0
+        # Counter bumped on every memcache update so readers can cheaply tell when scale values have changed.
+        self._generation = 0
+        # Scale values as last written to memcache, so unchanged readings can skip the write.
+        self._last_mc_state = None
         self._store_scale_config()
-        # Internal storage for scale readings to infer stability, used for scales that don't provide it.
-        self._readings = collections.deque(maxlen=int(config['scale']['stable_reading_length']))
+        # Unit bytes as sent by the scale mapped to both the unit and its resolution, so a reading needs one lookup.
+        self._unit_resolution_map = {k.encode(): (v, self.RESOLUTION_MAP[v]) for k, v in self.UNIT_MAP.items()}
+        # Bytes read from the serial port that don't yet make up a complete line.
+        self._buffer = bytearray()
+        # Run of identical consecutive readings to infer stability, used for scales that don't provide it.
+        self._stable_reading_length = int(config['scale']['stable_reading_length'])
+        self._last_reading = None
+        self._matching_count = 0
+        # Memcache writes happen on their own thread so reading the scale never waits on the network. Only the latest
+        # payload matters, so a newer reading replaces one that hasn't been written yet.
+        self._mc_ready = threading.Condition()
+        self._mc_dirty = False
+        if self._memcache:
+            threading.Thread(target=self._mc_drain, name='scale-memcache', daemon=True).start()
 
     def _update_memcache(self):
         """ Update memcache values if the memcache client has been provided."""
         if self._memcache:
-            self._memcache.set_multi({
-                self._constants.SCALE_STATUS.value: self.status,
-                self._constants.SCALE_WEIGHT.value: self.weight,
-                self._constants.SCALE_UNIT.value: self.unit,
-                self._constants.SCALE_RESOLUTION.value: self.resolution,
-                self._constants.SCALE_IS_STABLE.value: self.is_stable,
-            })
+            # Most readings repeat the previous one (is_stable follows from status), don't rewrite them.
+            state = (self.status, self.weight, self.unit, self.resolution)
+            if state == self._last_mc_state:
+                return
+            self._last_mc_state = state
+            self._generation += 1
+            with self._mc_ready:
+                payload = self._mc_payload
+                payload[self._generation_key] = self._generation
+                payload[self._status_key] = self.status
+                payload[self._weight_key] = self.weight
+                payload[self._unit_key] = self.unit
+                payload[self._resolution_key] = self.resolution
+                payload[self._is_stable_key] = self.is_stable
+                self._mc_dirty = True
+                self._mc_ready.notify()
+
+    def _mc_drain(self):
+        """Writes the latest scale values to memcache whenever they change, run on a background thread."""
+        next_error_log = 0.0
+        while 1:
+            with self._mc_ready:
+                while not self._mc_dirty:
+                    self._mc_ready.wait()
+                # Copy under the lock, then write without holding up the reader.
+                payload = dict(self._mc_payload)
+                self._mc_dirty = False
+            try:
+                self._memcache.set_multi(payload)
+            except (OSError, pymemcache.exceptions.MemcacheError):
+                # Forget what was written so the next reading is written again, even if it hasn't changed.
+                self._last_mc_state = None
+                now = time.monotonic()
+                if now >= next_error_log:
+                    logging.exception('Failed to write scale values to memcache.')
+                    next_error_log = now + MC_ERROR_LOG_INTERVAL
+
+    def _readline(self):
+        """Returns the most recent complete line from the serial port, or b'' if none arrived before the timeout.
+
+        The input buffer can fill up, causing latency. Rather than clearing it, which can cut a frame in half, drain
+        everything waiting into a userland buffer and skip straight to the freshest complete line.
+        """
+        buf = self._buffer
+        while 1:
+            # Wait (up to the serial timeout) for data, then take everything waiting with a single read.
+            if not select.select((self._fd,), (), (), self._timeout)[0]:
+                return b''
+            try:
+                chunk = os.read(self._fd, 4096)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                # Readable but empty means the device went away, same as pyserial reports it.
+                raise serial.SerialException('device reports readiness to read but returned no data')
+            buf += chunk
+            end = buf.rfind(b'\n')
+            if end != -1:
+                start = buf.rfind(b'\n', 0, end) + 1
+                line = bytes(buf[start:end + 1])
+                del buf[:end + 1]
+                return line
+
+    def fileno(self):
+        """Returns the serial port's file descriptor, so callers can wait for data with select."""
+        return self._fd
 
     def _graceful_exit(self):
         """Graceful exit, closes serial port."""
@@ -99,18 +235,22 @@ class SerialScale: # pylint: disable=too-many-instance-attributes;
         """Store the unit and status maps into memcache for reference elsewhere."""
         if self._memcache:
             self._memcache.set_multi({
-                self._constants.SCALE_UNITS.value: {x.name: x.value for x in self.Units},
-                self._constants.SCALE_UNIT_MAP.value: {k: self.unit_map[k].value for k in self.unit_map},
-                self._constants.SCALE_REVERSE_UNIT_MAP.value: {k.value: self.reverse_unit_map[k]
-                    for k in self.reverse_unit_map},
-                self._constants.SCALE_RESOLUTION_MAP.value: {k.value: self.resolution_map[k]
-                    for k in self.resolution_map},
-                self._constants.SCALE_STATUS_MAP.value: {x.name: x.value for x in self.StatusMap},
+                self._constants.SCALE_UNITS: {x.name: x.value for x in self.Units},
+                self._constants.SCALE_UNIT_MAP: {k: v.value for k, v in self.UNIT_MAP.items()},
+                self._constants.SCALE_REVERSE_UNIT_MAP: {k.value: v for k, v in self.REVERSE_UNIT_MAP.items()},
+                self._constants.SCALE_RESOLUTION_MAP: {k.value: v for k, v in self.RESOLUTION_MAP.items()},
+                self._constants.SCALE_STATUS_MAP: {x.name: x.value for x in self.StatusMap},
             })
 
-    def _check_stability(self):
-        """Checks the internal list of readings and infer if the scale reading is stable."""
-        if len(self._readings) == self._readings.maxlen and len(set(self._readings)) == 1:
+    def _push_reading(self, line):
+        """Counts consecutive identical readings and infers if the scale reading is stable."""
+        if line == self._last_reading:
+            if self._matching_count < self._stable_reading_length:
+                self._matching_count += 1
+        else:
+            self._last_reading = line
+            self._matching_count = 1
+        if self._matching_count >= self._stable_reading_length:
             self.status = self.StatusMap.STABLE
         else:
             self.status = self.StatusMap.UNSTABLE
@@ -118,31 +258,33 @@ class SerialScale: # pylint: disable=too-many-instance-attributes;
     @classmethod
     @property
     def unit_map(cls):
-        """Mapping of self.unit keys to string units of weight as used by the scale."""
-        raise NotImplementedError('')
+        """Mapping of self.unit keys to string units of weight as used by the scale, defined as UNIT_MAP."""
+        return cls.UNIT_MAP
 
     @classmethod
     @property
     def reverse_unit_map(cls):
-        """Reverse mapping of self.unit_map."""
-        cache_hit =  getattr(cls, '__cached_reverse_unit_map', None)
-        if cache_hit:
-            return cache_hit
-        reversed_map = dict((v, k) for k, v in cls.unit_map.items()) # pylint: disable=no-member;
-        cls.__cached_reverse_unit_map = reversed_map
-        return cls.__cached_reverse_unit_map
+        """Reverse mapping of self.unit_map, defined as REVERSE_UNIT_MAP."""
+        return cls.REVERSE_UNIT_MAP
 
     @classmethod
     @property
     def resolution_map(cls):
-        """Map self.Units to matching resolutions with decimal.Decimal values."""
-        raise NotImplementedError('')
+        """Map self.Units to matching resolutions with decimal.Decimal values, defined as RESOLUTION_MAP."""
+        return cls.RESOLUTION_MAP
 
     @property
     def is_stable(self):
         """Returns True if the scale is stable, otherwise False."""
         return self.status == self.StatusMap.STABLE
 
+    def _wait_for_unit_change(self, unit, timeout=1.0):
+        """Reads from the scale until it reports a unit other than unit, for at most timeout seconds."""
+        # Each update() waits for the next frame (up to the serial timeout), so this doesn't spin.
+        deadline = time.monotonic() + timeout
+        while self.unit == unit and time.monotonic() < deadline:
+            self.update()
+
     def change_unit(self):
         """Changes the unit of weight on the scale."""
         raise NotImplementedError('The change_unit() method needs to be defined in a brand-specific scale class.')
@@ -166,113 +308,82 @@ class ANDScale(SerialScale):
     timeout=0.1
     """
 
-    @classmethod
-    @property
-    def unit_map(cls):
-        """Mapping of self.unit keys to string units of weight as used by the scale."""
-        return {
-            'GN': cls.Units.GRAINS,
-            'g': cls.Units.GRAMS,
-        }
+    # Mapping of self.unit keys to string units of weight as used by the scale.
+    UNIT_MAP = {
+        'GN': SerialScale.Units.GRAINS,
+        'g': SerialScale.Units.GRAMS,
+    }
+    REVERSE_UNIT_MAP = {v: k for k, v in UNIT_MAP.items()}
+    # Map self.units to matching resolutions with decimal.Decimal values.
+    RESOLUTION_MAP = {
+        SerialScale.Units.GRAINS: decimal.Decimal('0.02'),
+        SerialScale.Units.GRAMS: decimal.Decimal('0.0001'),
+    }
 
-    @classmethod
-    @property
-    def resolution_map(cls):
-        """Map self.units to matching resolutions with decimal.Decimal values."""
-        return {
-            cls.Units.GRAINS: decimal.Decimal('0.02'),
-            cls.Units.GRAMS: decimal.Decimal('0.0001'),
+    def __init__(self, config, **kwargs):
+        """Constructor."""
+        super().__init__(config, **kwargs)
+        # Status values (provided by the AND scales) mapped to functions to handle those cases, built once. Handlers
+        # are bound to the status they set so frames don't need to look it up.
+        statuses = self.StatusMap
+        self._handlers = {
+            b'ST': functools.partial(self._reading, statuses.STABLE),
+            b'US': functools.partial(self._reading, statuses.UNSTABLE),
+            b'OL': functools.partial(self._status_only, statuses.OVERLOAD),
+            b'EC': functools.partial(self._status_only, statuses.ERROR),
+            b'AK': functools.partial(self._status_only, statuses.ACKNOWLEDGE),
+            b'TN': self._model_number,
+            b'SN': self._serial_number,
         }
 
     def change_unit(self):
         """Changes the unit of weight on the scale."""
         logging.debug('changing weight unit on scale from: %r', self.unit)
+        unit = self.unit
         # Send Mode button command.
         self._serial.write(b'U\r\n')
-        # Sleep 1s and wait for change to take effect.
-        time.sleep(1)
-        # Run update fn to set latest values.
-        self.update()
+        # Wait for the change to take effect.
+        self._wait_for_unit_change(unit)
 
     def update(self):
         """Read from the serial port and update an instance of this class with the most recent values."""
-        # Status values (provided by the AND scales) mapped to functions to handle those cases.
-        handlers = {
-            'ST': self._stable,
-            'US': self._unstable,
-            'OL': self._overload,
-            'EC': self._error,
-            'AK': self._acknowledge,
-            'TN': self._model_number,
-            'SN': self._serial_number,
-            None: noop,
-        }
-
-        # Note: The input buffer can fill up, causing latency. Clear it before reading.
-        self._serial.reset_input_buffer()
-        raw = self._serial.readline()
+        raw = self._readline()
+        # Nothing arrived before the serial timeout.
+        if not raw:
+            return
         logging.debug(raw)
-        try:
-            # Remove all leading and trailing whitespace characters then decode from bytestring into unicode.
-            line = raw.strip().decode('utf-8')
-        except UnicodeDecodeError:
-            logging.debug('Could not decode bytes to unicode.')
-        else:
-            # Pull the first characters (status code, on this scale)
-            prefix = line[0:2]
-            # Get a handler function based on the prefix
-            handler = handlers.get(prefix, noop)
+        # Remove all leading and trailing whitespace characters.
+        raw = raw.strip()
+        # Get a handler function based on the first bytes (status code, on this scale). Frames are ASCII with fixed
+        # columns, so handlers work on the bytes directly.
+        handler = self._handlers.get(raw[0:2])
+        if handler is not None:
             # Run the function to handle the input.
-            handler(line)
-
-    def _stable_unstable(self, line):
-        """Update the scale when status is stable or unstable."""
-        # Store the numeric weight from the scale reading.
-        weight = line[3:12].strip()
-        self.weight = decimal.Decimal(weight)
-        # Get the unit of measurement from the scale reading and store the mapped value.
-        unit = line[12:15].strip()
-        self.unit = self.unit_map[unit]
-        # Update the resolution according to the current unit of measure and supported resolutions.
-        self.resolution = self.resolution_map[self.unit]
-        # Update memcache values.
-        self._update_memcache()
+            handler(raw)
 
-    def _stable(self, line):
-        """Scale is stable."""
-        self.status = self.StatusMap.STABLE
-        self._stable_unstable(line)
+    # Frames look like 'ST,+00012.34 GN'.
+    _stable_unstable = _make_stable_unstable(weight_cols=slice(3, 12), unit_cols=slice(12, 15))
 
-    def _unstable(self, line):
-        """Scale is unstable."""
-        self.status = self.StatusMap.UNSTABLE
+    def _reading(self, status, line):
+        """Scale sent a weight reading, stable or unstable."""
+        self.status = status
         self._stable_unstable(line)
 
-    def _overload(self, line):
-        """Scale is overloaded."""
-        self.status = self.StatusMap.OVERLOAD
-        self._update_memcache()
-
-    def _error(self, line):
-        """Scale has an error."""
-        self.status = self.StatusMap.ERROR
-        self._update_memcache()
-
-    def _acknowledge(self, line):
-        """Scale has acknowledged a command."""
-        self.status = self.StatusMap.ACKNOWLEDGE
+    def _status_only(self, status, line):
+        """Scale is overloaded, has an error, or has acknowledged a command."""
+        self.status = status
         self._update_memcache()
 
     def _model_number(self, line):
         """Gets & prints the scale's model number."""
         self.status = self.StatusMap.MODEL_NUMBER
-        model_number = line[3:]
+        model_number = line[3:].decode('utf-8', 'replace')
         logging.info('scale model number: %s', model_number)
 
     def _serial_number(self, line):
         """Gets & prints the scale's serial number."""
         self.status = self.StatusMap.SERIAL_NUMBER
-        serial_number = line[3:]
+        serial_number = line[3:].decode('utf-8', 'replace')
         logging.info('scale serial number: %s', serial_number)
 
 
@@ -286,76 +397,43 @@ class CreedmoorScale(SerialScale):
     timeout=0.1
     """
 
-    @classmethod
-    @property
-    def unit_map(cls):
-        """Mapping of self.unit keys to string units of weight as used by the scale."""
-        return {
-            'GN': cls.Units.GRAINS,
-            'g': cls.Units.GRAMS,
-         }
-
-    @classmethod
-    @property
-    def resolution_map(cls):
-        """Map self.units to matching resolutions with decimal.Decimal values."""
-        return {
-            cls.Units.GRAINS: decimal.Decimal('0.01'),
-            cls.Units.GRAMS: decimal.Decimal('0.0001'),
-        }
+    # Mapping of self.unit keys to string units of weight as used by the scale.
+    UNIT_MAP = {
+        'GN': SerialScale.Units.GRAINS,
+        'g': SerialScale.Units.GRAMS,
+    }
+    REVERSE_UNIT_MAP = {v: k for k, v in UNIT_MAP.items()}
+    # Map self.units to matching resolutions with decimal.Decimal values.
+    RESOLUTION_MAP = {
+        SerialScale.Units.GRAINS: decimal.Decimal('0.01'),
+        SerialScale.Units.GRAMS: decimal.Decimal('0.0001'),
+    }
 
     # Note(eric): There is no documentation on how to do this for this scale.
     def change_unit(self):
         """Changes the unit of weight on the scale."""
         logging.debug('changing weight unit on scale from: %r', self.unit)
+        unit = self.unit
         # Send Mode button command.
         self._serial.write(b'U\r\n')
-        # Sleep 1s and wait for change to take effect.
-        time.sleep(1)
-        # Run update fn to set latest values.
-        self.update()
+        # Wait for the change to take effect.
+        self._wait_for_unit_change(unit)
 
     def update(self):
         """Read from the serial port and update an instance of this class with the most recent values."""
-        handlers = {
-            '+': self._stable_unstable,
-            '-': self._stable_unstable,
-            None: noop,
-        }
-
-        # Note: The input buffer can fill up, causing latency. Clear it before reading.
-        self._serial.reset_input_buffer()
-        raw = self._serial.readline()
+        raw = self._readline()
+        # Nothing arrived before the serial timeout.
+        if not raw:
+            return
         logging.debug(raw)
-        try:
-            # Remove trailing newline characters, then decode from bytestring into unicode.
-            line = raw.rstrip(b'\r\n').decode('utf-8')
-        except UnicodeDecodeError:
-            logging.debug('Could not decode bytes to unicode.')
-        else:
-            # Pull the first character (positive or negative, on this scale)
-            prefix = line[0:1]
-            # Get a handler function based on the prefix
-            handler = handlers.get(prefix, noop)
-            # Run the function to handle the input.
-            handler(line)
+        # Remove trailing newline characters.
+        raw = raw.rstrip(b'\r\n')
+        # Readings start with their sign (positive or negative, on this scale), anything else is ignored. Frames are
+        # ASCII with fixed columns, so the handler works on the bytes directly.
+        if raw[0:1] in (b'+', b'-'):
+            self._stable_unstable(raw)
 
-    def _stable_unstable(self, line):
-        """Update the scale when status is stable or unstable."""
-        # Push the latest reading into the internal list.
-        self._readings.append(line)
-        # Update internal stability bit.
-        self._check_stability()
-        # Store the numeric weight from the scale reading.
-        weight = line[0:8]
-        self.weight = decimal.Decimal(weight)
-        # Get the unit of measurement from the scale reading and store the mapped value.
-        unit = line[9:11]
-        self.unit = self.unit_map[unit]
-        # Update the resolution according to the current unit of measure and supported resolutions.
-        self.resolution = self.resolution_map[self.unit]
-        # Update memcache values.
-        self._update_memcache()
+    _stable_unstable = _make_stable_unstable(weight_cols=slice(0, 8), unit_cols=slice(9, 11), infer_stability=True)
 
 
 class USSolidScale(SerialScale):
@@ -368,23 +446,17 @@ class USSolidScale(SerialScale):
     timeout=0.1
     """
 
-    @classmethod
-    @property
-    def unit_map(cls):
-        """Mapping of self.unit keys to string units of weight as used by the scale."""
-        return {
-            'gn': cls.Units.GRAINS,
-            'g': cls.Units.GRAMS,
-         }
-
-    @classmethod
-    @property
-    def resolution_map(cls):
-        """Map self.units to matching resolutions with decimal.Decimal values."""
-        return {
-            cls.Units.GRAINS: decimal.Decimal('0.001'),
-            cls.Units.GRAMS: decimal.Decimal('0.001'),
-        }
+    # Mapping of self.unit keys to string units of weight as used by the scale.
+    UNIT_MAP = {
+        'gn': SerialScale.Units.GRAINS,
+        'g': SerialScale.Units.GRAMS,
+    }
+    REVERSE_UNIT_MAP = {v: k for k, v in UNIT_MAP.items()}
+    # Map self.units to matching resolutions with decimal.Decimal values.
+    RESOLUTION_MAP = {
+        SerialScale.Units.GRAINS: decimal.Decimal('0.001'),
+        SerialScale.Units.GRAMS: decimal.Decimal('0.001'),
+    }
 
     # Note(eric): There is no documentation on how to do this for this scale.
     def change_unit(self):
@@ -394,48 +466,79 @@ class USSolidScale(SerialScale):
 
     def update(self):
         """Read from the serial port and update an instance of this class with the most recent values."""
-        handlers = {
-            '+': self._stable_unstable,
-            '-': self._stable_unstable,
-            None: noop,
-        }
-
-        # Note: The input buffer can fill up, causing latency. Clear it before reading.
-        self._serial.reset_input_buffer()
-        raw = self._serial.readline()
+        raw = self._readline()
+        # Nothing arrived before the serial timeout.
+        if not raw:
+            return
         logging.debug(raw)
-        try:
-            # Remove trailing newline characters, then decode from bytestring into unicode.
-            line = raw.rstrip(b'\r\n').decode('utf-8')
-        except UnicodeDecodeError:
-            logging.debug('Could not decode bytes to unicode.')
-        else:
-            # Pull the first character (positive or negative, on this scale)
-            prefix = line[0:1]
-            # Get a handler function based on the prefix
-            handler = handlers.get(prefix, noop)
-            # Run the function to handle the input.
-            handler(line)
+        # Remove trailing newline characters.
+        raw = raw.rstrip(b'\r\n')
+        # Readings start with their sign (positive or negative, on this scale), anything else is ignored. Frames are
+        # ASCII with fixed columns, so the handler works on the bytes directly.
+        if raw[0:1] in (b'+', b'-'):
+            self._stable_unstable(raw)
 
-    def _stable_unstable(self, line):
-        """Update the scale when status is stable or unstable."""
-        # Push the latest reading into the internal list.
-        self._readings.append(line)
-        # Update internal stability bit.
-        self._check_stability()
-        # Store the numeric weight from the scale reading.
-        weight = line[0:9]
-        weight = weight.replace(' ', '')
-        self.weight = decimal.Decimal(weight)
-        # Get the unit of measurement from the scale reading and store the mapped value.
-        unit = line[9:11].strip()
-        self.unit = self.unit_map[unit]
-        # Update the resolution according to the current unit of measure and supported resolutions.
-        self.resolution = self.resolution_map[self.unit]
-        # Update memcache values.
-        self._update_memcache()
+    _stable_unstable = _make_stable_unstable(weight_cols=slice(0, 9), unit_cols=slice(9, 11), infer_stability=True)
 
 
+class ScaleReader(threading.Thread):
+    """Runs scale.update() continuously in a background thread so callers never block on the serial port.
+
+    The latest values are read straight from the scale's attributes. All serial access stays on this thread, so use
+    change_unit() here instead of on the scale.
+    """
+
+    def __init__(self, scale):
+        """Constructor."""
+        super().__init__(name='scale-reader', daemon=True)
+        self.scale = scale
+        self._updated = threading.Condition()
+        self._change_unit_requested = threading.Event()
+        self._change_unit_done = threading.Event()
+        # Exception which stopped the reader, re-raised to callers so the process fails as it would without a thread.
+        self._error = None
+
+    def run(self):
+        """Read from the scale forever, handling unit change requests between reads."""
+        try:
+            while 1:
+                if self._change_unit_requested.is_set():
+                    self._change_unit_requested.clear()
+                    self.scale.change_unit()
+                    self._change_unit_done.set()
+                self.scale.update()
+                with self._updated:
+                    self._updated.notify_all()
+        except Exception as exc: # pylint: disable=broad-except;
+            logging.exception('Scale reader stopped.')
+            self._error = exc
+            # Wake anything waiting on this thread so it sees the error.
+            with self._updated:
+                self._updated.notify_all()
+            self._change_unit_done.set()
+
+    def _raise_if_failed(self):
+        """Raises ScaleException if the reader thread has stopped with an error."""
+        if self._error is not None:
+            raise ScaleException('Scale reader stopped.') from self._error
+
+    def wait(self, timeout=None):
+        """Blocks until the next read from the scale completes. Returns False if it timed out."""
+        with self._updated:
+            self._raise_if_failed()
+            updated = self._updated.wait(timeout)
+        self._raise_if_failed()
+        return updated
+
+    def change_unit(self, timeout=5):
+        """Changes the unit of weight on the scale, blocking until the reader thread has done so."""
+        self._raise_if_failed()
+        self._change_unit_done.clear()
+        self._change_unit_requested.set()
+        if not self._change_unit_done.wait(timeout):
+            raise ScaleException('Timed out waiting for the scale to change units.')
+        self._raise_if_failed()
+
 SCALES = {
     'and': ANDScale,
     'creedmoor': CreedmoorScale,
@@ -449,6 +552,7 @@ SCALES = {
 if __name__ == '__main__':
     import argparse
     import configparser
+    import selectors
 
 
     # Default argument values.
@@ -510,5 +614,9 @@ if __name__ == '__main__':
         memcache=memcache_client,
         **kwargs)
 
+    # Sleep in the kernel until the scale sends data, rather than cycling through update() on every serial timeout.
+    selector = selectors.DefaultSelector()
+    selector.register(scale.fileno(), selectors.EVENT_READ)
     while 1:
-        scale.update()
+        if selector.select(timeout=1.0):
+            scale.update()